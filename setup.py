@@ -1,10 +1,17 @@
 from setuptools import setup
+from pathlib import Path
 import json
 import os
 pkg_name="zakuro"
+version = Path(f"{pkg_name}/version").read_text().strip()
+requirements = [
+    l.strip()
+    for l in Path("requirements.txt").read_text().splitlines()
+    if l.strip() and not l.strip().startswith("#")
+]
 setup(
     name="zakuro-ai",
-    version=open(f"{pkg_name}/version", "r").readline(),
+    version=version,
     short_description="Zakuro, the community cloud based technology powered by AI.",
     long_description="Zakuro, the community cloud based technology powered by AI.",
     url='https://zakuro.ai',
@@ -21,7 +28,7 @@ setup(
     keywords="fog computing, machine learning",
     author='ZakuroAI Team',
     python_requires='>=3.8',
-    install_requires=[l.rsplit() for l in open("requirements.txt", "r")],
+    install_requires=requirements,
     author_email='info@zakuro.ai',
     description='Zakuro, the community cloud based technology powered by AI.',
     platforms="linux_debian_10_x86_64",
@@ -0,0 +1,72 @@
+import types
+
+import pytest
+
+import zakuro
+from zakuro import context as C
+
+WORKERS = [
+    "tcp://10.0.0.1:4001",
+    "tcp://10.0.0.1:4002",
+    "tcp://10.0.0.12:4003",
+]
+
+
+class FakeClient:
+    def __init__(self, workers):
+        self._scheduler = types.SimpleNamespace(workers=dict.fromkeys(workers))
+        self.calls = 0
+
+    def submit(self, f, *args, **kwargs):
+        return f, args, kwargs
+
+    def run_on_scheduler(self, f):
+        self.calls += 1
+        return f(dask_scheduler=self._scheduler)
+
+
+@pytest.fixture
+def ctx_client(monkeypatch):
+    ctx = C.Context("zakuro://10.0.0.254")
+    client = FakeClient(WORKERS)
+    monkeypatch.setitem(C._CLIENTS, (ctx.url, ctx.backend_name), client)
+    # Worker() checks the address against the package-wide context.
+    monkeypatch.setattr(zakuro, "ctx", ctx)
+    return ctx, client
+
+
+def test_find(ctx_client):
+    ctx, client = ctx_client
+    assert ctx.find("10.0.0.1")._worker == "tcp://10.0.0.1:4001"
+    assert ctx.find("10.0.0.12")._worker == "tcp://10.0.0.12:4003"
+    assert ctx.find("10.0.0.")._worker == "tcp://10.0.0.1:4001"
+    assert ctx.find("10.0.0.2") is None
+
+
+def test_workers_ttl(ctx_client):
+    ctx, client = ctx_client
+    assert ctx.workers == WORKERS
+    ctx.find("10.0.0.1")
+    ctx.find("10.0.0.12")
+    assert client.calls == 1
+
+    ctx.workers_ttl = -1
+    assert ctx.workers == WORKERS
+    assert client.calls == 2
+
+
+def test_worker_submit_is_pinned(ctx_client):
+    ctx, client = ctx_client
+    worker = ctx.find("10.0.0.12")
+    assert worker.submit(abs, -1, key="task") == (
+        abs,
+        (-1,),
+        dict(
+            workers="tcp://10.0.0.12:4003",
+            allow_other_workers=False,
+            pure=False,
+            key="task",
+        ),
+    )
+    with pytest.raises(TypeError, match="allow_other_workers"):
+        worker.submit(abs, -1, allow_other_workers=True)
@@ -0,0 +1,212 @@
+import os
+import re
+import sys
+import types
+from collections import namedtuple
+
+import pytest
+
+from zakuro.fs import functional as F
+
+Obj = namedtuple("Obj", ["object_name", "is_dir"])
+
+
+class FakeClient:
+    """
+    Mimics the listings of minio-py: keys ending with "/" are folder markers
+    and come back with `is_dir` set, like the common prefixes of a shallow
+    listing.
+    """
+
+    def __init__(self, keys):
+        self._keys = sorted(keys)
+        self.calls = []
+
+    def fput_object(self, bucket, object_name, file):
+        self.calls.append(("fput_object", bucket, object_name, file))
+
+    def copy_object(self, bucket, object_name, source):
+        self.calls.append(
+            ("copy_object", bucket, object_name, source.bucket_name, source.object_name)
+        )
+
+    def remove_object(self, bucket, object_name):
+        self.calls.append(("remove_object", bucket, object_name))
+
+    def list_objects(self, bucket, prefix="", recursive=False, use_api_v1=True):
+        seen = set()
+        for key in self._keys:
+            if not key.startswith(prefix):
+                continue
+            if not recursive:
+                rest = key[len(prefix):]
+                if "/" in rest[:-1]:
+                    key = prefix + rest.split("/", 1)[0] + "/"
+            if key not in seen:
+                seen.add(key)
+                yield Obj(key, key.endswith("/"))
+
+
+def _install(monkeypatch, keys):
+    miniofs = types.ModuleType("miniofs")
+    miniofs.client = FakeClient(keys)
+    monkeypatch.setitem(sys.modules, "miniofs", miniofs)
+    return miniofs.client
+
+
+def test_listfiles_prefix_with_marker(monkeypatch):
+    _install(
+        monkeypatch,
+        ["csv/", "csv/a.csv", "csv/sub/", "csv/sub/b.csv", "other/c.csv"],
+    )
+    files = F.listfiles("zfs://KIRON/var/csv")
+    assert sorted(files) == [
+        "zfs://KIRON/var/csv/a.csv",
+        "zfs://KIRON/var/csv/sub/b.csv",
+    ]
+
+
+def test_listfiles_prefix_without_marker(monkeypatch):
+    _install(monkeypatch, ["csv/a.csv", "csv/sub/b.csv", "other/c.csv"])
+    files = F.listfiles("zfs://KIRON/var/csv")
+    assert sorted(files) == [
+        "zfs://KIRON/var/csv/a.csv",
+        "zfs://KIRON/var/csv/sub/b.csv",
+    ]
+
+
+def test_listfiles_patterns(monkeypatch):
+    _install(monkeypatch, ["csv/a.csv", "csv/b.txt", "csv/sub/c.csv"])
+    assert sorted(F.listfiles("zfs://KIRON/var/csv", patterns=["sub"])) == [
+        "zfs://KIRON/var/csv/sub/c.csv",
+    ]
+    assert sorted(F.listfiles("zfs://KIRON/var/csv", patterns=[r"\.txt$"])) == [
+        "zfs://KIRON/var/csv/b.txt",
+    ]
+    assert sorted(
+        F.listfiles("zfs://KIRON/var/csv", patterns=[re.compile(r"\.csv$")])
+    ) == [
+        "zfs://KIRON/var/csv/a.csv",
+        "zfs://KIRON/var/csv/sub/c.csv",
+    ]
+
+
+def test_list_objects_streams_sub_prefixes(monkeypatch):
+    # More keys than the queue holds with a single listing thread.
+    keys = [f"csv/{d}/{k}.csv" for d in range(3) for k in range(1500)]
+    _install(monkeypatch, keys)
+    names = [o.object_name for o in F.list_objects("zfs://KIRON/var/csv", 1)]
+    assert sorted(names) == sorted(keys)
+
+    objs = F.list_objects("zfs://KIRON/var/csv", 1)
+    assert next(objs).object_name in keys
+    objs.close()
+
+
+def test_list_objects_raises_listing_errors(monkeypatch):
+    class BrokenClient(FakeClient):
+        def list_objects(self, bucket, prefix="", recursive=False, use_api_v1=True):
+            if recursive:
+                raise IOError("listing failed")
+            return super().list_objects(bucket, prefix, recursive, use_api_v1)
+
+    miniofs = types.ModuleType("miniofs")
+    miniofs.client = BrokenClient(["csv/sub/a.csv"])
+    monkeypatch.setitem(sys.modules, "miniofs", miniofs)
+    with pytest.raises(IOError, match="listing failed"):
+        list(F.list_objects("zfs://KIRON/var/csv"))
+
+
+@pytest.fixture
+def local_dir(tmp_path):
+    os.makedirs(tmp_path / "data" / "sub")
+    for f in ["a.csv", "sub/b.csv"]:
+        open(tmp_path / "data" / f, "w").close()
+    return str(tmp_path / "data")
+
+
+@pytest.mark.parametrize("suffix", ["", "/"])
+def test_upload_directory(monkeypatch, local_dir, suffix):
+    client = _install(monkeypatch, [])
+    outputs = F.upload(local_dir + suffix, "zfs://KIRON/var/csv/")
+    assert sorted(outputs) == [
+        "zfs/var-kiron/csv/data/a.csv",
+        "zfs/var-kiron/csv/data/sub/b.csv",
+    ]
+    assert sorted(c[:3] for c in client.calls) == [
+        ("fput_object", "var-kiron", "csv/data/a.csv"),
+        ("fput_object", "var-kiron", "csv/data/sub/b.csv"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "dst, key",
+    [
+        ("zfs://KIRON/var/csv/", "csv/a.csv"),
+        ("zfs://KIRON/var/", "a.csv"),
+        ("zfs://KIRON/var/csv/c.csv", "csv/c.csv"),
+    ],
+)
+def test_upload_file(monkeypatch, local_dir, dst, key):
+    client = _install(monkeypatch, [])
+    file = os.path.join(local_dir, "a.csv")
+    assert F.upload(file, dst) == [f"zfs/var-kiron/{key}"]
+    assert client.calls == [("fput_object", "var-kiron", key, file)]
+
+
+def _moves(client):
+    copies = sorted(c[1:] for c in client.calls if c[0] == "copy_object")
+    removes = sorted(c[1:] for c in client.calls if c[0] == "remove_object")
+    assert removes == sorted(c[2:] for c in copies)
+    return [(f"{c[2]}/{c[3]}", f"{c[0]}/{c[1]}") for c in copies]
+
+
+@pytest.mark.parametrize("src", ["zfs://KIRON/var/csv", "zfs://KIRON/var/csv/"])
+def test_mv_directory(monkeypatch, src):
+    client = _install(monkeypatch, ["csv/a.csv", "csv/sub/b.csv", "other/c.csv"])
+    outputs = F.mv(src, "zfs://KIRON/trash/")
+    assert sorted(outputs) == [
+        "zfs/trash-kiron/csv/a.csv",
+        "zfs/trash-kiron/csv/sub/b.csv",
+    ]
+    assert _moves(client) == [
+        ("var-kiron/csv/a.csv", "trash-kiron/csv/a.csv"),
+        ("var-kiron/csv/sub/b.csv", "trash-kiron/csv/sub/b.csv"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "dst, key",
+    [
+        ("zfs://KIRON/trash/", "a.csv"),
+        ("zfs://KIRON/trash/csv/", "csv/a.csv"),
+        ("zfs://KIRON/trash/c.csv", "c.csv"),
+    ],
+)
+def test_mv_file(monkeypatch, dst, key):
+    client = _install(monkeypatch, ["csv/a.csv"])
+    assert F.mv("zfs://KIRON/var/csv/a.csv", dst) == [f"zfs/trash-kiron/{key}"]
+    assert _moves(client) == [("var-kiron/csv/a.csv", f"trash-kiron/{key}")]
+
+
+def test_mv_bucket_root(monkeypatch):
+    client = _install(monkeypatch, ["a.csv", "csv/b.csv"])
+    outputs = F.mv("zfs://KIRON/var/", "zfs://KIRON/trash/")
+    assert sorted(outputs) == [
+        "zfs/trash-kiron/var-kiron/a.csv",
+        "zfs/trash-kiron/var-kiron/csv/b.csv",
+    ]
+    assert _moves(client) == [
+        ("var-kiron/a.csv", "trash-kiron/var-kiron/a.csv"),
+        ("var-kiron/csv/b.csv", "trash-kiron/var-kiron/csv/b.csv"),
+    ]
+
+
+def test_mv_dry_run(monkeypatch):
+    client = _install(monkeypatch, ["csv/a.csv", "csv/sub/b.csv"])
+    outputs = F.mv("zfs://KIRON/var/csv", "zfs://KIRON/trash/", dry_run=True)
+    assert sorted(outputs) == [
+        "zfs/trash-kiron/csv/a.csv",
+        "zfs/trash-kiron/csv/sub/b.csv",
+    ]
+    assert client.calls == []
@@ -0,0 +1,110 @@
+import hashlib
+import os
+import pickle
+import sys
+import types
+
+import pytest
+
+from zakuro.hub import functional as H
+
+PAYLOAD = b"state dict bytes" * 1000
+DIGEST = hashlib.sha256(PAYLOAD).hexdigest()
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self._payload = payload
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size=1):
+        for k in range(0, len(self._payload), chunk_size):
+            yield self._payload[k : k + chunk_size]
+
+
+class FakeSession:
+    def get(self, url, stream=False):
+        return FakeResponse(PAYLOAD)
+
+
+@pytest.fixture(autouse=True)
+def session(monkeypatch):
+    monkeypatch.setattr(H, "_session", lambda: FakeSession())
+
+
+def test_download_model_matching_hash(tmp_path):
+    output_file = f"{tmp_path}/resnet18-{DIGEST[:8]}.pth"
+    assert H.download_model("resnet18", "v1", output_file)
+    assert open(output_file, "rb").read() == PAYLOAD
+
+
+def test_download_model_mismatch(tmp_path):
+    bad = "0123abcd" if not DIGEST.startswith("0123abcd") else "4567abcd"
+    output_file = f"{tmp_path}/resnet18-{bad}.pth"
+    with pytest.raises(IOError, match=DIGEST):
+        H.download_model("resnet18", "v1", output_file)
+    assert os.listdir(tmp_path) == []
+
+
+def test_download_model_date_suffix(tmp_path):
+    output_file = f"{tmp_path}/model-20240101.pth"
+    assert H._expected_sha256(output_file) is None
+    assert H.download_model("model", "v1", output_file)
+    assert open(output_file, "rb").read() == PAYLOAD
+
+
+def _fake_torch(monkeypatch, load):
+    torch = types.ModuleType("torch")
+    calls = []
+
+    def _load(path, **kwargs):
+        calls.append(kwargs)
+        return load(pickle, **kwargs)
+
+    torch.load = _load
+    monkeypatch.setitem(sys.modules, "torch", torch)
+    return calls
+
+
+KWARGS = dict(map_location="cpu", mmap=True, weights_only=True)
+
+
+def test_torch_load_legacy_checkpoint(monkeypatch):
+    def load(pickle, mmap, **kwargs):
+        if mmap:
+            raise RuntimeError("mmap can only be used with files saved with ...")
+        return "state_dict"
+
+    calls = _fake_torch(monkeypatch, load)
+    assert H._torch_load("ckpt.pth", KWARGS) == "state_dict"
+    assert calls[-1] == dict(KWARGS, mmap=False)
+
+
+def test_torch_load_not_weights_only(monkeypatch, capsys):
+    def load(pickle, weights_only, **kwargs):
+        if weights_only:
+            raise pickle.UnpicklingError("Weights only load failed")
+        return "state_dict"
+
+    calls = _fake_torch(monkeypatch, load)
+    assert H._torch_load("ckpt.pth", KWARGS) == "state_dict"
+    assert calls[-1] == dict(KWARGS, weights_only=False)
+    assert "weights_only=False" in capsys.readouterr().err
+
+
+def test_torch_load_corrupted(monkeypatch):
+    def load(pickle, **kwargs):
+        raise RuntimeError("PytorchStreamReader failed reading zip archive")
+
+    calls = _fake_torch(monkeypatch, load)
+    with pytest.raises(RuntimeError, match="zip archive"):
+        H._torch_load("ckpt.pth", KWARGS)
+    assert len(calls) == 1
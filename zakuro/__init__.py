@@ -8,4 +8,12 @@ ctx = Context("zakuro://10.13.13.2")
 # current_dir = os.path.dirname(__file__)
 # config = Namespace(**yaml.load(open(f"{current_dir}/config.yml"), Loader=ZakuroConfigLoader))
 from .functional import load_config, peer
-cfg = load_config()
+
+
+def __getattr__(name):
+    # The config is only parsed the first time `zakuro.cfg` is accessed.
+    if name == "cfg":
+        global cfg
+        cfg = load_config()
+        return cfg
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
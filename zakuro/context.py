@@ -10,11 +10,66 @@
 # from .functional import *
 # from zakuro.nn import load
 
-from distributed import Client
-
+import atexit
+import threading
+import time
 from dataclasses import dataclass, field
-from functools import cached_property
 from zakuro.var import __ZAKURO_URI__, __DASK__, __SPARK__
+
+_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def _connect(url, backend_name):
+    uri = f"{__ZAKURO_URI__}://"
+    url_splits = url.split(uri)
+    if backend_name == __DASK__:
+        assert url.startswith(uri)
+        url = f"tcp://{url_splits[1]}:8786"
+        from distributed import Client
+        return Client(url)
+    elif backend_name == __SPARK__:
+        url = f"spark://{url.split(uri)[1]}:7077"
+        from pyspark.sql import SparkSession
+        return SparkSession.builder.config(
+            "spark.driver.memory", "15g"
+        ).master(url).getOrCreate()
+    else:
+        raise Exception
+
+
+def get_client(url, backend_name=__DASK__):
+    """
+    Returns the backend client shared by every context of the process.
+
+    Args:
+        url (str): The URL of the backend.
+        backend_name (str): The name of the backend.
+
+    Returns:
+        object: The Dask client or the Spark session.
+    """
+    key = (url, backend_name)
+    try:
+        return _CLIENTS[key]
+    except KeyError:
+        with _CLIENTS_LOCK:
+            if key not in _CLIENTS:
+                _CLIENTS[key] = _connect(url, backend_name)
+            return _CLIENTS[key]
+
+
+@atexit.register
+def _close_clients():
+    with _CLIENTS_LOCK:
+        for (_, backend_name), client in _CLIENTS.items():
+            try:
+                client.stop() if backend_name == __SPARK__ else client.close()
+            except Exception:
+                pass
+        _CLIENTS.clear()
+
+
 @dataclass
 class Context:
     """
@@ -23,6 +78,7 @@ class Context:
     Attributes:
         url (str): The URL of the backend.
         backend_name (str): The name of the backend (default: __DASK__).
+        workers_ttl (float): Seconds during which the worker list is reused (default: 5.0).
 
     Methods:
         _cdata: Returns the backend client or session.
@@ -34,23 +90,34 @@ class Context:
 
     url: str
     backend_name: str = __DASK__
+    workers_ttl: float = 5.0
+    _workers: tuple = field(default=None, init=False, repr=False, compare=False)
 
-    @cached_property
+    @property
     def _cdata(self):
-        uri = f"{__ZAKURO_URI__}://"
-        url_splits = self.url.split(uri)
-        if self.backend_name == __DASK__:
-            assert self.url.startswith(uri)
-            url = f"tcp://{url_splits[1]}:8786"
-            return Client(url)
-        elif self.backend_name == __SPARK__:
-            url = f"spark://{self.url.split(uri)[1]}:7077"
-            from pyspark.sql import SparkSession
-            return SparkSession.builder.config(
-                "spark.driver.memory", "15g"
-            ).master(url).getOrCreate()
-        else:
-            raise Exception
+        return get_client(self.url, self.backend_name)
+
+    def _workers_index(self):
+        """
+        Returns the cached worker nodes and their index by host, refreshed
+        from the scheduler once older than `workers_ttl`.
+
+        Returns:
+            tuple: The list of worker nodes and a dict mapping hosts to nodes.
+        """
+        now = time.monotonic()
+        if self._workers is None or now - self._workers[0] > self.workers_ttl:
+            # Only the addresses travel back, not the whole scheduler_info().
+            # A lambda is pickled by value, the scheduler needs no zakuro install.
+            workers = self._cdata.run_on_scheduler(
+                lambda dask_scheduler: list(dask_scheduler.workers)
+            )
+            # The first worker of a host wins, like the scan in `find`.
+            index = {}
+            for w in workers:
+                index.setdefault(w.split("://")[-1].rsplit(":", 1)[0], w)
+            self._workers = (now, workers, index)
+        return self._workers[1:]
 
     @property
     def workers(self):
@@ -61,7 +128,7 @@ class Context:
             list: A list of worker nodes.
         """
         assert self.backend_name == __DASK__
-        return list(self._cdata.scheduler_info()['workers'].keys())
+        return list(self._workers_index()[0])
 
     def get_worker(self, worker):
         """
@@ -91,8 +158,11 @@ class Context:
             Worker: The worker object matching the IP address, or None if not found.
         """
         from zakuro.worker import Worker
-        for w in self.workers:
-            if w.__contains__(ip):
+        workers, index = self._workers_index()
+        if ip in index:
+            return Worker(index[ip])
+        for w in workers:
+            if ip in w:
                 return Worker(w)
 
     def submit(self, *args, **kwargs):
@@ -107,4 +177,4 @@ class Context:
             object: The result of the task execution.
         """
         assert self.backend_name == __DASK__
-        return self._cdata.submit(*args, **kwargs)
\ No newline at end of file
+        return self._cdata.submit(*args, **kwargs)
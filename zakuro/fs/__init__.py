@@ -1,10 +1,12 @@
 from .functional import *
-from minio import Minio
-from zakuro import cfg
 client = None
 
 
 def refresh():
+    import urllib3
+    from minio import Minio
+    from zakuro import cfg
+
     try:
         assert os.path.exists(os.environ["MINIOFS_CREDS"])
     except:
@@ -16,11 +18,21 @@ def refresh():
         )
 
     global client
+    # Same timeout and retries as the default MinIO client, with a pool large
+    # enough for the parallel listings and transfers of zakuro.fs.
+    http_client = urllib3.PoolManager(
+        timeout=urllib3.Timeout(connect=300, read=300),
+        maxsize=64,
+        retries=urllib3.Retry(
+            total=5, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504]
+        ),
+    )
     client0 = Minio(
         cfg.host,
         secure=False,
         access_key=access_key,
         secret_key=secret_key,
+        http_client=http_client,
     )
     client = client0
 
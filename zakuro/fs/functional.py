@@ -1,13 +1,17 @@
 # from gnutools.fs import load_config as _load_config, parent
 from gnutools.fs import parent
 import os
-from tqdm import tqdm
+import queue
 import re
+import threading
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
 # from gnutools.utils import id_generator
 from gnutools import fs
 
 from zakuro.var import __FILESTORE__
 from zakuro.var import __ZFS_URI__
+@lru_cache(maxsize=1 << 16)
 def PathURI(src):
     if not src.startswith(f"{__ZFS_URI__}://"):
         if src.startswith(f"/{__ZFS_URI__}/"):
@@ -24,6 +28,7 @@ def PathURI(src):
     return src
 
 
+@lru_cache(maxsize=1 << 16)
 def Path(src):
     src = PathURI(src)
     return f"/{__ZFS_URI__}/{src.split('zfs://')[1]}"
@@ -100,6 +105,7 @@ def allow_spark(spark):
     return spark
 
 
+@lru_cache(maxsize=1 << 16)
 def bucket_prefix(root):
     bucket, _, _, prefix = split_zfs(root)
     return bucket, prefix
@@ -142,7 +148,7 @@ def get_dir(src):
 
 
 def listparents(*args, **kwargs):
-    return list(set([fs.parent(f) for f in listfiles(*args, **kwargs)]))
+    return list({f.rsplit("/", 1)[0] for f in iterfiles(*args, **kwargs)})
 
 
 def listdirs(src):
@@ -151,29 +157,89 @@ def listdirs(src):
 
 def list_empty(src):
     group, partition = split_zfs(src)[1:3]
-    dirs = [
-        f"{__ZFS_URI__}://{group.upper()}/{partition.lower()}/{obj.object_name}"
-        for obj in list_objects(src)
-        if obj.is_dir
-    ]
+    root = f"{__ZFS_URI__}://{group.upper()}/{partition.lower()}/"
+    dirs = [root + obj.object_name for obj in list_objects(src) if obj.is_dir]
     return dirs
 
 
-def list_objects(src):
+def _concurrency(name, max_workers=None):
+    return max_workers or int(os.environ.get(name, 32))
+
+
+def _iter_prefix(bucket, prefix, recursive=True):
     from miniofs import client
 
+    # ListObjectsV2, the client follows the continuation tokens page by page.
+    return client.list_objects(
+        bucket, prefix=prefix, recursive=recursive, use_api_v1=False
+    )
+
+
+_DONE = object()
+
+
+def _put(out, item, stop):
+    # Gives up once the consumer is gone rather than blocking on a full queue.
+    while not stop.is_set():
+        try:
+            out.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _walk_prefix(bucket, prefix, out, stop):
     try:
-        assert get_dir(src) is not None
-    except:
-        return []
+        if not stop.is_set():
+            for obj in _iter_prefix(bucket, prefix):
+                if not _put(out, obj, stop):
+                    break
+    except Exception as e:
+        _put(out, e, stop)
+    finally:
+        _put(out, _DONE, stop)
+
+
+def list_objects(src, max_workers=None):
     src = PathURI(src)
     bucket, prefix = bucket_prefix(src)
-    objs = [
-        obj
-        for obj in client.list_objects(bucket, recursive=True, prefix=prefix)
-        if obj.object_name.startswith(f"{prefix}")
-    ]
-    return objs
+    if prefix and not prefix.endswith("/"):
+        prefix = f"{prefix}/"
+    max_workers = _concurrency("ZFS_LS_CONCURRENCY", max_workers)
+    # A shallow listing splits the search space into sub-prefixes which are
+    # then listed recursively in parallel. The listings feed a bounded queue
+    # (about one 1000-key page per thread), so objects are yielded as soon as
+    # their page is available, in no particular order across sub-prefixes.
+    subdirs = []
+    for obj in _iter_prefix(bucket, prefix, recursive=False):
+        # The folder marker of the prefix itself is not a sub-prefix, listing
+        # it again would return every object twice.
+        if obj.is_dir and obj.object_name != prefix:
+            subdirs.append(obj.object_name)
+        else:
+            yield obj
+    if len(subdirs) > 0:
+        out = queue.Queue(maxsize=1000 * max_workers)
+        stop = threading.Event()
+        ex = ThreadPoolExecutor(max_workers=max_workers)
+        for sub in subdirs:
+            ex.submit(_walk_prefix, bucket, sub, out, stop)
+        try:
+            pending = len(subdirs)
+            while pending > 0:
+                item = out.get()
+                if item is _DONE:
+                    pending -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            # Also reached when the consumer stops early: the remaining
+            # listings stop at their next page instead of running to the end.
+            stop.set()
+            ex.shutdown(wait=False)
 
 
 def heal(src):
@@ -196,31 +262,34 @@ def heal(src):
 #     retyrb fukes
 
 
-def listfiles(src, patterns=[], uri=True, absolute=False):
+def iterfiles(src, patterns=[], uri=True, absolute=False):
     src = f"{src}/" if not src.endswith("/") else src
     group, partition = split_zfs(src)[1:3]
-    files = [
-        f"{__ZFS_URI__}://{group.upper()}/{partition.lower()}/{obj.object_name}"
-        for obj in list_objects(src)
-        if not obj.is_dir
-    ]
-
-    def check_conditions(cnds, f):
-        for c in cnds:
-            try:
-                assert re.search(c, f) is None
-            except AssertionError:
-                return True
-        return False
+    root = f"{__ZFS_URI__}://{group.upper()}/{partition.lower()}/"
+    files = (root + obj.object_name for obj in list_objects(src) if not obj.is_dir)
 
     if len(patterns) > 0:
-        files = [f for f in files if check_conditions(patterns, f)]
+        # Keep the files matching any of the patterns. Strings without regex
+        # metacharacters are plain substring tests, anything else (including
+        # already compiled patterns) goes through re.
+        literals = [p for p in patterns if isinstance(p, str) and re.escape(p) == p]
+        compiled = [re.compile(p) for p in patterns if p not in literals]
+        files = (
+            f
+            for f in files
+            if any(l in f for l in literals) or any(p.search(f) for p in compiled)
+        )
     if absolute:
-        return [Path(f) for f in files]
+        return (Path(f) for f in files)
     elif uri:
-        return [PathURI(f) for f in files]
+        # Already canonical, built from the normalized group and partition.
+        return files
     else:
-        return [map_uri(f) for f in files]
+        return (map_uri(f) for f in files)
+
+
+def listfiles(src, patterns=[], uri=True, absolute=False):
+    return list(iterfiles(src, patterns, uri=uri, absolute=absolute))
 
 
 # def listfiles(src, patterns=[], recursive=True, uri=True):
@@ -253,12 +322,14 @@ def listfiles(src, patterns=[], uri=True, absolute=False):
 #         files = [Path(f) for f in files]
 #     return files
 
-def download_file(file, filestore=f"/{__FILESTORE__}"):
+def _output_file(file, filestore=f"/{__FILESTORE__}"):
+    bucket, object_name = bucket_prefix(file)
+    return bucket, object_name, os.path.join(f"{filestore}/{bucket}", object_name)
+
+
+def _fget(bucket, object_name, output_file):
     from miniofs import client
 
-    bucket, object_name = bucket_prefix(file)
-    output_file = os.path.join(f"{filestore}/{bucket}", object_name)
-    os.makedirs(parent(output_file), exist_ok=True)
     client.fget_object(
         bucket,
         object_name,
@@ -267,14 +338,31 @@ def download_file(file, filestore=f"/{__FILESTORE__}"):
     return output_file
 
 
-def download_files(root, patterns=[], filestore=f"/{__FILESTORE__}"):
+def download_file(file, filestore=f"/{__FILESTORE__}"):
+    bucket, object_name, output_file = _output_file(file, filestore=filestore)
+    os.makedirs(parent(output_file), exist_ok=True)
+    return _fget(bucket, object_name, output_file)
+
+
+def download_files(root, patterns=[], filestore=f"/{__FILESTORE__}", max_workers=None):
+    from tqdm import tqdm
+
     files = listfiles(root, patterns)
-    return [
-        download_file(file, filestore=filestore)
-        for file in tqdm(
-            files, total=len(files), desc=f"Downloading objects to {filestore}"
-        )
-    ]
+    targets = [_output_file(file, filestore=filestore) for file in files]
+    # Create the directories once upfront rather than from every thread.
+    for d in set([parent(output_file) for _, _, output_file in targets]):
+        os.makedirs(d, exist_ok=True)
+    max_workers = _concurrency("ZFS_DL_CONCURRENCY", max_workers)
+    outputs = [None] * len(targets)
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        futures = {ex.submit(_fget, *target): k for k, target in enumerate(targets)}
+        for future in tqdm(
+            as_completed(futures),
+            total=len(futures),
+            desc=f"Downloading objects to {filestore}",
+        ):
+            outputs[futures[future]] = future.result()
+    return outputs
 
 
 # def split_object_name(file, filestore="/FileStore"):
@@ -284,24 +372,41 @@ def download_files(root, patterns=[], filestore=f"/{__FILESTORE__}"):
 #     return bucket, object_name
 
 
-def upload(file, zfs_path):
-    splits = zfs_path.split(f"{__ZFS_URI__}://")[1].split("/")
-    group = splits[0].lower()
-    partition = splits[1].lower()
-    suffix = "/".join(splits[2:])
-    # from miniofs import client
+def _join(prefix, name):
+    prefix = prefix.rstrip("/")
+    return f"{prefix}/{name}" if prefix else name
 
-    # bucket, object_name = split_object_name(file, filestore=filestore)
-    # client.fput_object(
-    #     bucket,
-    #     object_name,
-    #     file,
-    # )
-    # return f"zfs://{bucket}/{object_name}"
-    command = f"mc cp -r {file} {__ZFS_URI__}/{partition}-{group}/{suffix}"
-    os.system(command)
 
+def _fput(bucket, object_name, file):
+    from miniofs import client
+
+    # MinIO picks the part size from the file size, from 5 MiB up. A fixed
+    # 100 MiB part is held in memory by every upload thread.
+    client.fput_object(bucket, object_name, file)
+    return f"{__ZFS_URI__}/{bucket}/{object_name}"
+
+
+def upload(file, zfs_path, max_workers=None):
+    bucket, _, _, suffix = split_zfs(zfs_path)
+    # Same layout as `mc cp -r`: a directory is copied under its own name.
+    if os.path.isdir(file):
+        root = _join(suffix, os.path.basename(file.rstrip("/")))
+        uploads = [
+            (f"{root}/{os.path.relpath(os.path.join(d, f), file)}", os.path.join(d, f))
+            for d, _, files in os.walk(file)
+            for f in files
+        ]
+    elif suffix == "" or suffix.endswith("/"):
+        uploads = [(_join(suffix, os.path.basename(file)), file)]
+    else:
+        uploads = [(suffix, file)]
+    with ThreadPoolExecutor(
+        max_workers=_concurrency("ZFS_UL_CONCURRENCY", max_workers)
+    ) as ex:
+        return list(ex.map(lambda u: _fput(bucket, *u), uploads))
 
+
+@lru_cache(maxsize=1 << 16)
 def split_zfs(src):
     src = PathURI(src)
     splits = src.split(f"{__ZFS_URI__}://")[1].split("/")
@@ -312,20 +417,61 @@ def split_zfs(src):
     return f"{partition}-{group}", group, partition, suffix
 
 
+@lru_cache(maxsize=1 << 16)
 def map_uri(src):
     bucket, _, _, suffix = split_zfs(src)
     return f"zfs/{bucket}/{suffix}"
 
 
-def mv(src, dst, dry_run=False, verbose=False):
-    # command = f"nohup mc mv -q -r {map_uri(src)} {map_uri(dst)} >/tmp/.miniofs.out 2>&1 &"
+def _split_map_uri(src):
+    splits = src.split("/", 2)
+    return splits[1], splits[2] if len(splits) > 2 else ""
+
+
+def _move_object(src_bucket, src_key, dst_bucket, dst_key):
+    from minio.commonconfig import CopySource
+    from miniofs import client
+
+    client.copy_object(dst_bucket, dst_key, CopySource(src_bucket, src_key))
+    client.remove_object(src_bucket, src_key)
+    return f"{__ZFS_URI__}/{dst_bucket}/{dst_key}"
+
+
+def mv(src, dst, dry_run=False, verbose=False, max_workers=None):
+    from miniofs import client
+
     src = map_uri(src) if not src.startswith("zfs/") else src
     dst = map_uri(dst) if not dst.startswith("zfs/") else dst
-
-    command = f"mc mv -q -r {src} {dst} >> /tmp/.miniofs.out"
-    print(command) if verbose else None
-    os.system(command) if not dry_run else None
-    return command
+    src_bucket, src_key = _split_map_uri(src)
+    dst_bucket, dst_key = _split_map_uri(dst)
+
+    # Same layout as `mc mv -r`: a directory is moved under its own name, the
+    # bucket root under the name of the bucket.
+    src_dir = src_key.rstrip("/")
+    prefix = f"{src_dir}/" if src_dir else ""
+    keys = [
+        obj.object_name
+        for obj in client.list_objects(src_bucket, prefix=prefix, recursive=True)
+    ]
+    if len(keys) > 0:
+        root = _join(dst_key, src_dir.split("/")[-1] if src_dir else src_bucket)
+        moves = [(k, f"{root}/{k[len(prefix):]}") for k in keys]
+    elif dst_key == "" or dst_key.endswith("/"):
+        moves = [(src_key, _join(dst_key, src_key.split("/")[-1]))]
+    else:
+        moves = [(src_key, dst_key)]
+
+    if verbose:
+        for k, t in moves:
+            print(f"{src_bucket}/{k} -> {dst_bucket}/{t}")
+    if dry_run:
+        return [f"{__ZFS_URI__}/{dst_bucket}/{t}" for _, t in moves]
+    with ThreadPoolExecutor(
+        max_workers=_concurrency("ZFS_MV_CONCURRENCY", max_workers)
+    ) as ex:
+        return list(
+            ex.map(lambda m: _move_object(src_bucket, m[0], dst_bucket, m[1]), moves)
+        )
 
 
 def exists(src):
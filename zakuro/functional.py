@@ -1,4 +1,6 @@
+import os
 import sys
+from functools import lru_cache
 
 # import yaml
 # from argparse import Namespace
@@ -79,15 +81,32 @@ except ImportError:
                 sys.stderr.write("\n")
 
 
+@lru_cache(maxsize=1)
+def _read_config(filename, mtime):
+    return _load_config(filename)
+
+
 def load_config():
+    # Parsed once, and again only when the file changes on disk.
     filename = f"{parent(__file__)}/config.yaml"
-    cfg = _load_config(filename)
+    cfg = _read_config(filename, os.stat(filename).st_mtime_ns)
     return cfg
 
 
+@lru_cache(maxsize=1)
 def get_ip():
-    import subprocess
+    import fcntl
+    import socket
+    import struct
 
-    result = subprocess.run("zc wg0ip", shell=True, check=True, capture_output=True)
-    host = result.stdout.decode().rsplit()[0]
-    return host
+    try:
+        # SIOCGIFADDR, read the wg0 address straight from the kernel.
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            ifreq = fcntl.ioctl(sock.fileno(), 0x8915, struct.pack("256s", b"wg0"))
+        return socket.inet_ntoa(ifreq[20:24])
+    except OSError:
+        import subprocess
+
+        result = subprocess.run(["zc", "wg0ip"], check=True, capture_output=True)
+        host = result.stdout.decode().rsplit()[0]
+        return host
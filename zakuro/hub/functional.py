@@ -1,10 +1,28 @@
 import os
+import re
+import hashlib
+import inspect
+from functools import lru_cache
 import zakuro
-from zakuro import config
-from gnutools.fs import parent
-import requests
+from zakuro import cfg as config
 import sys
-import torch
+
+
+@lru_cache(maxsize=1)
+def _session():
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=8,
+        pool_maxsize=32,
+        max_retries=Retry(total=3, backoff_factor=0.5),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
 
 
 def restart_from(model, model_path):
@@ -19,7 +37,7 @@ def restart_from(model, model_path):
 
 def restart_from_hub(model, key):
     model_name, version = key.split(config.ZAKURO_URI)[1].split("/")
-    output_dir = f"{config.DEFAULT_ZAKURO_HOME}/{model_name}"
+    output_dir = f"{config.ZAKURO_HOME}/{model_name}"
     output_file = f"{output_dir}/{version}.pth"
 
     # Download the model
@@ -32,23 +50,91 @@ def restart_from_hub(model, key):
     return model
 
 
-def load_ckpt(model, model_path):
+@lru_cache(maxsize=1)
+def _torch_load_kwargs():
+    import torch
+
+    # mmap defers page-ins to tensor access, only on torch versions that support it.
+    params = inspect.signature(torch.load).parameters
+    kwargs = dict(map_location="cpu")
+    kwargs.update(dict([(k, True) for k in ["mmap", "weights_only"] if k in params]))
+    return kwargs
+
+
+@lru_cache(maxsize=4)
+def _read_state_dict(model_path, mtime, size):
     try:
         ckpt = zakuro.load(model_path)
-        model.load_state_dict(ckpt.state_dict)
+        return ckpt.state_dict
     except:
-        state_dict = torch.load(model_path)
-        model.load_state_dict(state_dict)
+        return _torch_load(model_path, _torch_load_kwargs())
+
+
+def _torch_load(model_path, kwargs):
+    import pickle
+    import torch
+
+    try:
+        return torch.load(model_path, **kwargs)
+    except RuntimeError as e:
+        # Legacy (non-zipfile) checkpoints cannot be memory-mapped.
+        if not kwargs.get("mmap") or "mmap" not in str(e):
+            raise
+        return _torch_load(model_path, dict(kwargs, mmap=False))
+    except pickle.UnpicklingError:
+        # weights_only rejects checkpoints holding non-tensor objects.
+        if not kwargs.get("weights_only"):
+            raise
+        sys.stderr.write(
+            f"ZakuroHub >> {model_path} is not a weights-only checkpoint, "
+            "loading it with weights_only=False\n"
+        )
+        return _torch_load(model_path, dict(kwargs, weights_only=False))
+
+
+def load_ckpt(model, model_path):
+    # Keyed by mtime and size so a rewritten checkpoint is read again.
+    st = os.stat(model_path)
+    state_dict = _read_state_dict(model_path, st.st_mtime_ns, st.st_size)
+    model.load_state_dict(state_dict)
+
+
+def _expected_sha256(output_file):
+    # Files named like resnet18-bfd8deac.pth carry a prefix of their sha256.
+    # Digit-only suffixes such as model-20240101.pth are dates, not hashes.
+    match = re.search(config.HASH_REGEX_EXP, os.path.basename(output_file))
+    if match is None:
+        return None
+    digest = match.group(1)
+    if 8 <= len(digest) <= 64 and re.search("[a-f]", digest):
+        return digest
+    return None
 
 
 def download_model(model_name, version, output_file):
-    tmp_file = f"/tmp/{version}.pth"
-    print(f"ZakuroHub >> Downloading the model from {config.ZAKURO_URI}{model_name}/{version}...")
-    res = requests.get(f"{config.ZAKURO_HUB}/{model_name}/{version}")
-    assert res.status_code==200
-    with open(tmp_file, "wb") as f:
-        f.write(res.content)
+    from gnutools.fs import parent
+
     output_dir = parent(output_file)
     os.makedirs(output_dir, exist_ok=True)
-    os.system(f"mv {tmp_file} {output_dir}")
-    return os.path.exists(output_file)
\ No newline at end of file
+    # Stream next to the destination so the final rename is atomic.
+    tmp_file = f"{output_file}.part"
+    print(f"ZakuroHub >> Downloading the model from {config.ZAKURO_URI}{model_name}/{version}...")
+    expected = _expected_sha256(output_file)
+    sha256 = hashlib.sha256()
+    with _session().get(f"{config.ZAKURO_HUB}/{model_name}/{version}", stream=True) as res:
+        res.raise_for_status()
+        try:
+            with open(tmp_file, "wb") as f:
+                for chunk in res.iter_content(chunk_size=config.READ_DATA_CHUNK):
+                    sha256.update(chunk)
+                    f.write(chunk)
+            if expected is not None and not sha256.hexdigest().startswith(expected):
+                raise IOError(
+                    f"Corrupted download of {model_name}/{version}: expected sha256 "
+                    f"{expected}..., got {sha256.hexdigest()}"
+                )
+        except BaseException:
+            os.remove(tmp_file) if os.path.exists(tmp_file) else None
+            raise
+    os.replace(tmp_file, output_file)
+    return os.path.exists(output_file)
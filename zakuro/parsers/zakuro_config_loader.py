@@ -1,8 +1,14 @@
 import yaml
 import os
 
+try:
+    # libyaml bindings, same semantics as the pure-Python loader.
+    from yaml import CFullLoader as _FullLoader
+except ImportError:
+    from yaml import FullLoader as _FullLoader
 
-class ZakuroConfigLoader(yaml.FullLoader):
+
+class ZakuroConfigLoader(_FullLoader):
     def __init__(self, *args, **kwargs):
         super(ZakuroConfigLoader, self).__init__(*args, **kwargs)
 
@@ -13,10 +19,7 @@ class ZakuroConfigLoader(yaml.FullLoader):
 
     @staticmethod
     def __try_expandvars(v):
-        try:
-            assert type(v)==str
-            assert v[0] =="$"
-            v = os.path.expandvars(v)
-            return v
-        except AssertionError:
-            return v
\ No newline at end of file
+        # Explicit checks, assertions are stripped under python -O.
+        if isinstance(v, str) and v.startswith("$"):
+            return os.path.expandvars(v)
+        return v
@@ -1,10 +1,19 @@
+from functools import partial
+
 
 class Worker:
     def __init__(self, worker):
         from zakuro import ctx
         assert worker in ctx.workers
         self._worker = worker
+        # Pinning arguments bound once rather than merged on every call.
+        pin = dict(workers=worker, allow_other_workers=False, pure=False)
+        self._pin = pin
+        self._submit = partial(ctx.submit, **pin)
         
     def submit(self, f, *args, **kwargs):
-        from zakuro import ctx
-        return ctx.submit(f, *args, **kwargs, workers=self._worker, allow_other_workers=False, pure=False)
\ No newline at end of file
+        # Call-time keywords would override the partial ones and unpin the task.
+        if not self._pin.keys().isdisjoint(kwargs):
+            key = next(k for k in self._pin if k in kwargs)
+            raise TypeError(f"submit() got multiple values for keyword argument '{key}'")
+        return self._submit(f, *args, **kwargs)